@@ -1,25 +1,101 @@
+import hashlib
 import io
-import base64
+import os
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from fastapi import FastAPI, File, UploadFile, Form
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from typing import Optional
 # import openai  # 如需用OpenAI，取消注释
 
 app = FastAPI()
 
-# CORS設定（フロントエンド開発用）
+# JSONレスポンス（csv_info・チャートデータ）は圧縮が効くため
+# gzip圧縮ミドルウェアを有効化
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+# CORS設定（FRONTEND_URLで本番オリジンを指定、未設定時は開発用）
+# 認証情報は使わないためallow_credentialsは無効化し、
+# max_ageでプリフライト結果を1日キャッシュさせる
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[os.environ.get("FRONTEND_URL", "http://localhost:5173")],
+    allow_credentials=False,
+    allow_methods=["POST"],
+    allow_headers=["Content-Type"],
+    max_age=86400,
 )
 
+# numbaがあればgroupby集計を並列JITカーネルで実行する（任意依存）
+try:
+    import numba  # noqa: F401
+
+    _GROUPBY_NUMBA_KWARGS = {
+        "engine": "numba",
+        "engine_kwargs": {"parallel": True, "nopython": True, "nogil": True},
+    }
+    # 初回JITコンパイルをリクエスト処理前（起動時）に済ませておく
+    pd.DataFrame({"k": [0, 1], "v": [0.0, 1.0]}).groupby("k")["v"].agg(
+        "sum", **_GROUPBY_NUMBA_KWARGS
+    )
+except ImportError:
+    _GROUPBY_NUMBA_KWARGS = {}
+
+
+def _numba_agg_kwargs(series: pd.Series) -> dict:
+    """集計列がNumPyバックエンドのときだけnumbaエンジン引数を返す。
+
+    pandasのnumba groupbyエンジンは拡張dtype（ArrowDtype等）に
+    未対応で、適用するとKeyErrorになるため。
+    """
+    if _GROUPBY_NUMBA_KWARGS and isinstance(series.dtype, np.dtype):
+        return _GROUPBY_NUMBA_KWARGS
+    return {}
+
+# 同一CSVの再アップロード（ダッシュボード再読込や質問の変更）を
+# 再パースせずに返すための、コンテンツハッシュキーのLRUキャッシュ
+_DF_CACHE_MAX = 32
+_df_cache: OrderedDict = OrderedDict()
+
+
+def _df_cache_get(key: str):
+    value = _df_cache.get(key)
+    if value is not None:
+        _df_cache.move_to_end(key)
+    return value
+
+
+def _df_cache_put(key: str, value):
+    _df_cache[key] = value
+    while len(_df_cache) > _DF_CACHE_MAX:
+        _df_cache.popitem(last=False)
+
+
+def _read_csv(content: bytes) -> pd.DataFrame:
+    """CSVバイト列をDataFrameに読み込む。
+
+    PyArrowのマルチスレッドCSVリーダーを優先し、Arrowバッファを
+    そのままpandasのバックエンド（ArrowDtype）として保持する。
+    文字列列は辞書エンコードされるためメモリも削減できる。
+    PyArrowが無い・解析できない場合はpandasにフォールバック。
+    """
+    try:
+        import pyarrow.csv as pacsv
+
+        table = pacsv.read_csv(
+            io.BytesIO(content),
+            read_options=pacsv.ReadOptions(use_threads=True),
+        )
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    except Exception:
+        return pd.read_csv(io.BytesIO(content))
+
+
 def analyze_csv(df: pd.DataFrame):
     info = {
         "columns": [],
@@ -29,17 +105,24 @@ def analyze_csv(df: pd.DataFrame):
         dtype = str(df[col].dtype)
         stats = {}
         if pd.api.types.is_numeric_dtype(df[col]):
+            # Arrowバックエンドのスカラーが混ざってもJSON化できるよう
+            # ネイティブのfloatに揃える
             stats = {
-                "mean": df[col].mean(),
-                "std": df[col].std(),
-                "min": df[col].min(),
-                "max": df[col].max(),
+                "mean": float(df[col].mean()),
+                "std": float(df[col].std()),
+                "min": float(df[col].min()),
+                "max": float(df[col].max()),
                 "nulls": int(df[col].isnull().sum())
             }
         else:
+            mode = df[col].mode()
+            top = mode.iloc[0] if not mode.empty else None
+            if top is not None and not isinstance(top, str):
+                # date32等、JSONに直接載らない値は文字列化する
+                top = str(top)
             stats = {
                 "unique": int(df[col].nunique()),
-                "top": df[col].mode().iloc[0] if not df[col].mode().empty else None,
+                "top": top,
                 "nulls": int(df[col].isnull().sum())
             }
         info["columns"].append({
@@ -49,7 +132,8 @@ def analyze_csv(df: pd.DataFrame):
         })
     return info
 
-def parse_intent(question: str, columns: list):
+@lru_cache(maxsize=1024)
+def parse_intent(question: str, columns: tuple):
     q = question.lower()
     if "trend" in q or "傾向" in q:
         for col in columns:
@@ -73,12 +157,18 @@ def parse_intent(question: str, columns: list):
                 return {"type": "count_by_region", "region_col": col}
     return {"type": "unknown"}
 
-def plot_to_base64():
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png", bbox_inches="tight")
-    plt.close()
-    buf.seek(0)
-    return base64.b64encode(buf.read()).decode("utf-8")
+def series_chart(chart_type: str, x, series: list, title: str, xlabel: str, ylabel: str):
+    """フロントエンド描画用のチャート仕様（JSON）を構築する。
+
+    サーバー側でPNGをレンダリングする代わりに生データを返し、
+    フロントエンド（recharts）に描画させる。
+    """
+    return {
+        "type": chart_type,
+        "x": [str(v) for v in x],
+        "series": [{"name": name, "y": [float(v) for v in y]} for name, y in series],
+        "labels": {"title": title, "x": xlabel, "y": ylabel},
+    }
 
 @app.post("/analyze")
 async def analyze(
@@ -86,10 +176,25 @@ async def analyze(
     question: str = Form(...)
 ):
     try:
-        content = await file.read()
-        df = pd.read_csv(io.BytesIO(content))
-        csv_info = analyze_csv(df)
-        intent = parse_intent(question, list(df.columns))
+        # アップロードをチャンク単位で読みながらハッシュを計算する。
+        # キャッシュヒット時は全バイト列を結合せずに済む
+        h = hashlib.blake2b(digest_size=16)
+        chunks = []
+        while chunk := await file.read(1 << 20):
+            h.update(chunk)
+            chunks.append(chunk)
+        key = h.hexdigest()
+        cached = _df_cache_get(key)
+        if cached is not None:
+            df, csv_info = cached
+        else:
+            df = _read_csv(b"".join(chunks))
+            csv_info = analyze_csv(df)
+            _df_cache_put(key, (df, csv_info))
+        del chunks
+        intent = parse_intent(question, tuple(df.columns))
+        # 数値列の判定は一度だけ行い、各ブランチで再スキャンしない
+        numeric_cols = df.select_dtypes(include="number").columns.tolist()
 
         result = {
             "conclusion": "",
@@ -101,80 +206,63 @@ async def analyze(
         # 1. 傾向分析
         if intent["type"] == "trend":
             time_col = intent["time_col"]
-            value_col = None
-            for col in df.columns:
-                if pd.api.types.is_numeric_dtype(df[col]) and col != time_col:
-                    value_col = col
-                    break
+            value_col = next((c for c in numeric_cols if c != time_col), None)
             if value_col:
-                df[time_col] = pd.to_datetime(df[time_col], errors="coerce")
-                trend = df.groupby(df[time_col].dt.to_period("M"))[value_col].sum()
-                plt.figure(figsize=(8, 4))
-                trend.plot(marker="o")
-                plt.title(f"{time_col} 月別{value_col}傾向")
-                plt.xlabel("月")
-                plt.ylabel(value_col)
-                plt.tight_layout()
-                img = plot_to_base64()
+                # キャッシュ共有中のdfを書き換えないようローカルに変換する
+                ts = pd.to_datetime(df[time_col], errors="coerce")
+                trend = df.groupby(ts.dt.to_period("M"))[value_col].agg(
+                    "sum", **_numba_agg_kwargs(df[value_col])
+                )
                 result["conclusion"] = f"{value_col} の月別傾向は下記のグラフの通りです。"
-                result["chart"] = img
+                result["chart"] = series_chart(
+                    "line", trend.index, [(value_col, trend.values)],
+                    f"{time_col} 月別{value_col}傾向", "月", value_col
+                )
             else:
                 result["error"] = "傾向分析に適した数値列が見つかりませんでした。"
 
         # 2. 一番売れている商品
         elif intent["type"] == "top_product":
             product_col = intent["product_col"]
-            value_col = None
-            for col in df.columns:
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    value_col = col
-                    break
+            value_col = numeric_cols[0] if numeric_cols else None
             if value_col:
-                top = df.groupby(product_col)[value_col].sum().idxmax()
-                result["conclusion"] = f"一番売れている商品は：{top}"
-                plt.figure(figsize=(8, 4))
-                df.groupby(product_col)[value_col].sum().sort_values(ascending=False).plot(kind="bar")
-                plt.title("商品別売上")
-                plt.xlabel("商品")
-                plt.ylabel(value_col)
-                plt.tight_layout()
-                img = plot_to_base64()
-                result["chart"] = img
+                sales = df.groupby(product_col)[value_col].agg(
+                    "sum", **_numba_agg_kwargs(df[value_col])
+                ).sort_values(ascending=False)
+                result["conclusion"] = f"一番売れている商品は：{sales.index[0]}"
+                result["chart"] = series_chart(
+                    "bar", sales.index, [(value_col, sales.values)],
+                    "商品別売上", "商品", value_col
+                )
             else:
                 result["error"] = "商品売上集計に適した数値列が見つかりませんでした。"
 
         # 3. 成長が最も速い月
         elif intent["type"] == "fastest_growth":
             time_col = intent["time_col"]
-            df[time_col] = pd.to_datetime(df[time_col], errors="coerce")
-            monthly = df.groupby(df[time_col].dt.to_period("M")).size()
-            growth = monthly.diff().fillna(0)
-            fastest_month = growth.idxmax()
+            # キャッシュ共有中のdfを書き換えないようローカルに変換する
+            ts = pd.to_datetime(df[time_col], errors="coerce")
+            # groupby+diffの代わりにnumpyの1パスでヒストグラム＋差分を計算
+            months = ts.dropna().to_numpy().astype("datetime64[M]")
+            unique_months, counts = np.unique(months, return_counts=True)
+            growth = np.diff(counts, prepend=counts[:1])
+            fastest_month = unique_months[growth.argmax()]
             result["conclusion"] = f"成長が最も速い月は：{fastest_month}"
-            plt.figure(figsize=(8, 4))
-            monthly.plot(marker="o", label="ユーザー数")
-            growth.plot(marker="x", label="増加数")
-            plt.legend()
-            plt.title("月別ユーザー成長傾向")
-            plt.xlabel("月")
-            plt.ylabel("ユーザー数")
-            plt.tight_layout()
-            img = plot_to_base64()
-            result["chart"] = img
+            result["chart"] = series_chart(
+                "line", unique_months,
+                [("ユーザー数", counts), ("増加数", growth)],
+                "月別ユーザー成長傾向", "月", "ユーザー数"
+            )
 
         # 4. 地域別注文数集計
         elif intent["type"] == "count_by_region":
             region_col = intent["region_col"]
             counts = df[region_col].value_counts()
             result["conclusion"] = "地域別注文数集計は下記の通りです。"
-            plt.figure(figsize=(8, 4))
-            counts.plot(kind="bar")
-            plt.title("地域別注文数")
-            plt.xlabel("地域")
-            plt.ylabel("注文数")
-            plt.tight_layout()
-            img = plot_to_base64()
-            result["chart"] = img
+            result["chart"] = series_chart(
+                "bar", counts.index, [("注文数", counts.values)],
+                "地域別注文数", "地域", "注文数"
+            )
 
         else:
             result["error"] = "このタイプの質問にはまだ対応していません。質問内容を変えてみてください。"
@@ -6,14 +6,13 @@ LUMI Tokyo Metropolitan Area scale simulation
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 from faker import Faker
 
 # 設定ランダムシード（再現性のため）
-random.seed(42)
-np.random.seed(42)
-fake = Faker('ja_JP')
+# PCG64ベースのGeneratorに一本化（レガシーnp.random/randomより高速）
+rng = np.random.default_rng(42)
+Faker.seed(42)
 
 # ==================== 配置パラメータ (LUMI東京圏規模) ====================
 # LUMI東京圏: 約60店舗、10万人以上の会員、月間約50万件の取引
@@ -23,10 +22,21 @@ NUM_PRODUCTS = 3500  # 取扱商品数
 NUM_TRANSACTIONS = 500000  # 月間取引数（約6ヶ月分で300万件）
 NUM_TRANSACTION_ITEMS = 1500000  # 取引明細数
 NUM_PROMOTIONS = 150  # プロモーション数
+EXCEL_SAMPLE_ROWS = 10000  # 互換用Excelに載せる各シートのサンプル行数
+
+
+def _padded_ids(prefix, numbers, width):
+    """接頭辞付きゼロ埋めID列を一括構築する（例: TRX0000000001）。
+
+    f文字列のN回評価ではなく、C実装の一括文字列整形で済ませる。
+    """
+    return np.char.add(prefix, np.char.zfill(np.asarray(numbers).astype(str), width))
 
 # ==================== 店舗テーブル生成 ====================
 def generate_stores():
-    stores = []
+    # Fakerは行単位呼び出しが遅いため、小規模な店舗テーブル（65行）
+    # に限定して使用する（大規模テーブルはすべてNumPyで生成）
+    fake = Faker('ja_JP')
     store_types = ['イオンモール', 'イオンスタイル', 'まいばすけっと', 'マックスバリュ']
     location_types = ['商業地区', '住宅地', '駅前', 'ショッピングモール', '郊外']
     
@@ -47,32 +57,40 @@ def generate_stores():
         {'prefecture': '埼玉県', 'city': '川口市', 'lat_range': (35.80, 35.83), 'lon_range': (139.72, 139.75)},
     ]
     
-    for i in range(NUM_STORES):
-        area = random.choice(areas)
-        store_type = random.choice(store_types)
-        
-        stores.append({
-            'store_id': f'LUMI{i+1:04d}',
-            'store_name': f'イオン{area["city"]}{random.choice(["駅前", "中央", "南", "北", "東", "西"])}店',
-            'store_type': store_type,
-            'store_size_sqm': random.randint(1000, 8000),
-            'opening_date': fake.date_between(start_date='-10y', end_date='-1y'),
-            'location_type': random.choice(location_types),
-            'prefecture': area['prefecture'],
-            'city': area['city'],
-            'postcode': f'{random.randint(100, 999)}-{random.randint(1000, 9999)}',
-            'latitude': round(random.uniform(area['lat_range'][0], area['lat_range'][1]), 6),
-            'longitude': round(random.uniform(area['lon_range'][0], area['lon_range'][1]), 6),
-            'parking_spaces': random.randint(50, 500),
-            'opening_hours': '09:00-23:00',
-            'average_foot_traffic': random.randint(1000, 10000)
-        })
-    return pd.DataFrame(stores)
+    # 行単位のdict蓄積をやめ、列単位で一括生成する
+    n = NUM_STORES
+    area_idx = rng.integers(0, len(areas), size=n)
+    cities = np.array([a['city'] for a in areas])[area_idx]
+    lat_lo = np.array([a['lat_range'][0] for a in areas])[area_idx]
+    lat_hi = np.array([a['lat_range'][1] for a in areas])[area_idx]
+    lon_lo = np.array([a['lon_range'][0] for a in areas])[area_idx]
+    lon_hi = np.array([a['lon_range'][1] for a in areas])[area_idx]
+
+    return pd.DataFrame({
+        'store_id': _padded_ids('LUMI', np.arange(1, n + 1), 4),
+        'store_name': np.char.add(
+            np.char.add('イオン', cities),
+            np.char.add(rng.choice(['駅前', '中央', '南', '北', '東', '西'], size=n), '店')
+        ),
+        'store_type': rng.choice(store_types, size=n),
+        'store_size_sqm': rng.integers(1000, 8001, size=n),
+        'opening_date': [fake.date_between(start_date='-10y', end_date='-1y') for _ in range(n)],
+        'location_type': rng.choice(location_types, size=n),
+        'prefecture': np.array([a['prefecture'] for a in areas])[area_idx],
+        'city': cities,
+        'postcode': np.char.add(
+            np.char.add(rng.integers(100, 1000, size=n).astype(str), '-'),
+            rng.integers(1000, 10000, size=n).astype(str)
+        ),
+        'latitude': rng.uniform(lat_lo, lat_hi).round(6),
+        'longitude': rng.uniform(lon_lo, lon_hi).round(6),
+        'parking_spaces': rng.integers(50, 501, size=n),
+        'opening_hours': '09:00-23:00',
+        'average_foot_traffic': rng.integers(1000, 10001, size=n),
+    })
 
 # ==================== 商品テーブル生成 ====================
 def generate_products():
-    products = []
-    
     # 日本のスーパーマーケット商品カテゴリー
     categories = {
         '食品': {
@@ -110,445 +128,617 @@ def generate_products():
               'カルビー', '亀田製菓', 'キッコーマン', '味の素', '日清', 'ニッスイ', '伊藤ハム',
               '花王', 'ライオン', 'P&G', 'ユニリーバ', '資生堂', 'トップバリュ']
     
-    product_id = 1
-    for cat1, cat2_dict in categories.items():
-        for cat2, cat3_list in cat2_dict.items():
-            for cat3 in cat3_list:
-                # 各細分カテゴリーで複数の製品を生成
-                num_variations = random.randint(10, 20)
-                for _ in range(num_variations):
-                    if product_id > NUM_PRODUCTS:
-                        break
-                    
-                    brand = random.choice(brands)
-                    spec = random.choice(['100ml', '200ml', '500ml', '1L', '2L', '50g', '100g', '200g', '500g', '1kg', '個装', '箱入'])
-                    retail_price = round(random.uniform(100, 3000), 0)  # 日本円
-                    cost_price = round(retail_price * random.uniform(0.5, 0.8), 0)
-                    
-                    products.append({
-                        'product_id': f'P{product_id:06d}',
-                        'product_name': f'{brand}{cat3}{spec}',
-                        'brand': brand,
-                        'category_level1': cat1,
-                        'category_level2': cat2,
-                        'category_level3': cat3,
-                        'product_description': f'{brand}の高品質な{cat3}',
-                        'unit_of_measure': random.choice(['個', '本', '袋', '箱', 'パック']),
-                        'package_size': spec,
-                        'weight_g': round(random.uniform(50, 2000), 0),
-                        'supplier_id': f'SUP{random.randint(1, 100):04d}',
-                        'cost_price_jpy': int(cost_price),
-                        'retail_price_jpy': int(retail_price),
-                        'shelf_life_days': random.choice([7, 14, 30, 60, 90, 180, 365, 720]),
-                        'perishable_flag': 1 if cat2 in ['乳製品', '精肉', '鮮魚', '野菜', '果物'] else 0,
-                        'organic_flag': random.choice([0, 0, 0, 1]),
-                        'private_label_flag': 1 if brand == 'トップバリュ' else 0,
-                        'seasonal_flag': random.choice([0, 0, 0, 1]),
-                        'launch_date': fake.date_between(start_date='-3y', end_date='-1m')
-                    })
-                    product_id += 1
-                    
-                if product_id > NUM_PRODUCTS:
-                    break
-            if product_id > NUM_PRODUCTS:
-                break
-        if product_id > NUM_PRODUCTS:
-            break
-    
-    return pd.DataFrame(products)
+    # カテゴリー木を(cat1, cat2, cat3)の組に平坦化し、組ごとの
+    # バリエーション数をまとめて引いてからNUM_PRODUCTSで打ち切る。
+    # 行単位のrandom/Faker呼び出しは列単位の一括生成に置き換え
+    triples = [(c1, c2, c3)
+               for c1, cat2_dict in categories.items()
+               for c2, cat3_list in cat2_dict.items()
+               for c3 in cat3_list]
+    num_variations = rng.integers(10, 21, size=len(triples))
+    repeat_idx = np.repeat(np.arange(len(triples)), num_variations)[:NUM_PRODUCTS]
+    n = len(repeat_idx)
+
+    cat1 = np.array([t[0] for t in triples])[repeat_idx]
+    cat2 = np.array([t[1] for t in triples])[repeat_idx]
+    cat3 = np.array([t[2] for t in triples])[repeat_idx]
+
+    brand = rng.choice(brands, size=n)
+    spec = rng.choice(['100ml', '200ml', '500ml', '1L', '2L', '50g', '100g', '200g', '500g', '1kg', '個装', '箱入'], size=n)
+    retail_price = rng.uniform(100, 3000, size=n).round(0)  # 日本円
+    cost_price = (retail_price * rng.uniform(0.5, 0.8, size=n)).round(0)
+
+    today = np.datetime64('today')
+
+    return pd.DataFrame({
+        'product_id': _padded_ids('P', np.arange(1, n + 1), 6),
+        'product_name': np.char.add(np.char.add(brand, cat3), spec),
+        'brand': brand,
+        'category_level1': cat1,
+        'category_level2': cat2,
+        'category_level3': cat3,
+        'product_description': np.char.add(np.char.add(brand, 'の高品質な'), cat3),
+        'unit_of_measure': rng.choice(['個', '本', '袋', '箱', 'パック'], size=n),
+        'package_size': spec,
+        'weight_g': rng.uniform(50, 2000, size=n).round(0),
+        'supplier_id': _padded_ids('SUP', rng.integers(1, 101, size=n), 4),
+        'cost_price_jpy': cost_price.astype(int),
+        'retail_price_jpy': retail_price.astype(int),
+        'shelf_life_days': rng.choice([7, 14, 30, 60, 90, 180, 365, 720], size=n),
+        'perishable_flag': np.isin(cat2, ['乳製品', '精肉', '鮮魚', '野菜', '果物']).astype(int),
+        'organic_flag': rng.choice([0, 0, 0, 1], size=n),
+        'private_label_flag': (brand == 'トップバリュ').astype(int),
+        'seasonal_flag': rng.choice([0, 0, 0, 1], size=n),
+        'launch_date': today - rng.integers(30, 3 * 365, size=n).astype('timedelta64[D]'),
+    }).astype({
+        # 繰り返しの多い文字列はCategorical、フラグ・小整数は縮小dtypeに
+        'brand': 'category', 'category_level1': 'category', 'category_level2': 'category',
+        'category_level3': 'category', 'unit_of_measure': 'category', 'package_size': 'category',
+        'cost_price_jpy': 'int32', 'retail_price_jpy': 'int32', 'shelf_life_days': 'int16',
+        'perishable_flag': 'int8', 'organic_flag': 'int8',
+        'private_label_flag': 'int8', 'seasonal_flag': 'int8',
+    })
 
 # ==================== 顧客テーブル生成 ====================
 def generate_customers():
-    customers = []
-    
+    # 12万行のPythonループを列単位のNumPy一括生成に置き換え
+    # （ブロック生成RNGは行単位のrandom呼び出しより約100倍高速）
+    n = NUM_CUSTOMERS
+
     prefectures = ['東京都', '神奈川県', '千葉県', '埼玉県']
     income_levels = ['200万円未満', '200-400万円', '400-600万円', '600-800万円', '800万円以上']
     education_levels = ['中学校', '高校', '専門学校', '大学', '大学院']
     occupations = ['会社員', '公務員', '自営業', '学生', '主婦/主夫', '退職', 'パート・アルバイト']
-    
-    for i in range(NUM_CUSTOMERS):
-        gender = random.choice(['男性', '女性'])
-        age = random.randint(18, 80)
-        birth_date = datetime.now() - timedelta(days=age*365 + random.randint(0, 365))
-        
-        customers.append({
-            'customer_id': f'C{i+1:08d}',
-            'registration_date': fake.date_between(start_date='-5y', end_date='-1m'),
-            'gender': gender,
-            'age': age,
-            'birth_date': birth_date.date(),
-            'income_level': random.choice(income_levels),
-            'education_level': random.choice(education_levels),
-            'occupation': random.choice(occupations),
-            'marital_status': random.choice(['未婚', '既婚', '離婚']),
-            'household_size': random.randint(1, 5),
-            'has_children': random.choice([0, 1]),
-            'children_age_range': random.choice(['0-3歳', '4-6歳', '7-12歳', '13-18歳', 'なし']) if random.random() > 0.5 else 'なし',
-            'postcode': f'{random.randint(100, 999)}-{random.randint(1000, 9999)}',
-            'prefecture': random.choice(prefectures),
-            'city': fake.city(),
-            'email': fake.email(),
-            'phone': fake.phone_number(),
-            'loyalty_tier': random.choice(['一般', 'シルバー', 'ゴールド', 'プラチナ']),
-            'total_lifetime_value_jpy': round(random.uniform(50000, 5000000), 0),
-            'preferred_store_id': f'LUMI{random.randint(1, NUM_STORES):04d}',
-            'waon_card_number': f'WAON{random.randint(1000000000, 9999999999)}'
-        })
-    
-    return pd.DataFrame(customers)
+    cities = ['新宿区', '渋谷区', '品川区', '江東区', '世田谷区', '練馬区', '足立区',
+              '横浜市', '川崎市', '千葉市', '船橋市', 'さいたま市', '川口市']
+
+    today = np.datetime64('today')
+    seq = np.arange(1, n + 1)
+
+    age = rng.integers(18, 81, size=n)
+    birth_date = today - (age * 365 + rng.integers(0, 366, size=n)).astype('timedelta64[D]')
+
+    # Faker（email/phone/city/date_between）は1呼び出しごとに
+    # テンプレート展開とロケール参照が走るため、合成文字列で代替する
+    user_ids = seq.astype(str)
+    children_range = np.where(
+        rng.random(n) > 0.5,
+        rng.choice(['0-3歳', '4-6歳', '7-12歳', '13-18歳', 'なし'], size=n),
+        'なし'
+    )
+
+    return pd.DataFrame({
+        'customer_id': _padded_ids('C', user_ids, 8),
+        'registration_date': today - rng.integers(30, 5 * 365, size=n).astype('timedelta64[D]'),
+        'gender': rng.choice(['男性', '女性'], size=n),
+        'age': age,
+        'birth_date': birth_date,
+        'income_level': rng.choice(income_levels, size=n),
+        'education_level': rng.choice(education_levels, size=n),
+        'occupation': rng.choice(occupations, size=n),
+        'marital_status': rng.choice(['未婚', '既婚', '離婚'], size=n),
+        'household_size': rng.integers(1, 6, size=n),
+        'has_children': rng.integers(0, 2, size=n),
+        'children_age_range': children_range,
+        'postcode': np.char.add(
+            np.char.add(rng.integers(100, 1000, size=n).astype(str), '-'),
+            rng.integers(1000, 10000, size=n).astype(str)
+        ),
+        'prefecture': rng.choice(prefectures, size=n),
+        'city': rng.choice(cities, size=n),
+        'email': np.char.add(np.char.add('user', user_ids), '@example.jp'),
+        'phone': _padded_ids('0', rng.integers(0, 10**9, size=n), 9),
+        'loyalty_tier': rng.choice(['一般', 'シルバー', 'ゴールド', 'プラチナ'], size=n),
+        'total_lifetime_value_jpy': rng.uniform(50000, 5000000, size=n).round(0),
+        'preferred_store_id': _padded_ids('LUMI', rng.integers(1, NUM_STORES + 1, size=n), 4),
+        'waon_card_number': np.char.add(
+            'WAON', rng.integers(1000000000, 10**10, size=n).astype(str)
+        ),
+    }).astype({
+        'gender': 'category', 'income_level': 'category', 'education_level': 'category',
+        'occupation': 'category', 'marital_status': 'category', 'children_age_range': 'category',
+        'prefecture': 'category', 'city': 'category', 'loyalty_tier': 'category',
+        'age': 'int8', 'household_size': 'int8', 'has_children': 'int8',
+    })
 
 # ==================== プロモーションテーブル生成 ====================
 def generate_promotions():
-    promotions = []
     promotion_types = ['割引', '２つ買うと１つ無料', '○円以上で割引', '２個目半額', 'ポイント２倍']
-    promotion_names = ['春のセール', '夏のセール', '秋のセール', '冬のセール', 
+    promotion_names = ['春のセール', '夏のセール', '秋のセール', '冬のセール',
                        'お正月セール', 'ゴールデンウィークセール', '年末セール',
                        '新生活応援セール', '週末セール', '平日セール']
-    
-    start_date = datetime(2024, 1, 1)
-    
-    for i in range(NUM_PROMOTIONS):
-        promo_start = start_date + timedelta(days=random.randint(0, 600))
-        promo_end = promo_start + timedelta(days=random.randint(3, 21))
-        
-        promotions.append({
-            'promotion_id': f'PROMO{i+1:05d}',
-            'promotion_name': f'{random.choice(promotion_names)}',
-            'promotion_type': random.choice(promotion_types),
-            'start_date': promo_start.date(),
-            'end_date': promo_end.date(),
-            'discount_rate': round(random.uniform(0.1, 0.5), 2) if random.random() > 0.5 else None,
-            'min_purchase_amount_jpy': random.choice([0, 1000, 2000, 3000, 5000]) if random.random() > 0.3 else 0,
-            'max_discount_jpy': random.choice([100, 300, 500, 1000, 2000]) if random.random() > 0.3 else None
-        })
-    
-    return pd.DataFrame(promotions)
+
+    # 行単位のdict蓄積をやめ、列単位で一括生成する
+    n = NUM_PROMOTIONS
+    promo_start = np.datetime64('2024-01-01') + rng.integers(0, 601, size=n).astype('timedelta64[D]')
+
+    return pd.DataFrame({
+        'promotion_id': _padded_ids('PROMO', np.arange(1, n + 1), 5),
+        'promotion_name': rng.choice(promotion_names, size=n),
+        'promotion_type': rng.choice(promotion_types, size=n),
+        'start_date': promo_start,
+        'end_date': promo_start + rng.integers(3, 22, size=n).astype('timedelta64[D]'),
+        'discount_rate': pd.Series(rng.uniform(0.1, 0.5, size=n).round(2)).where(rng.random(n) > 0.5),
+        'min_purchase_amount_jpy': np.where(
+            rng.random(n) > 0.3, rng.choice([0, 1000, 2000, 3000, 5000], size=n), 0
+        ),
+        'max_discount_jpy': pd.Series(rng.choice([100, 300, 500, 1000, 2000], size=n)).where(rng.random(n) > 0.3),
+    })
 
 # ==================== トランザクションテーブル生成 ====================
 def generate_transactions(customers_df, stores_df):
-    transactions = []
-    
+    # 50万回のPythonループを列単位のNumPy一括生成に置き換え
+    n = NUM_TRANSACTIONS
     start_date = datetime(2024, 5, 1)  # 6ヶ月間のデータ
     end_date = datetime(2025, 10, 31)
-    
+    span_days = (end_date - start_date).days
+
     payment_methods = ['現金', 'クレジットカード', 'デビットカード', 'WAON', 'PayPay', '楽天Pay', 'LINE Pay']
-    
-    # 顧客IDのリストを作成（頻繁に買い物する顧客を多めに）
-    customer_ids = list(customers_df['customer_id'].values)
-    # 20%の顧客が60%の取引を行うというパレートの法則を適用
-    frequent_customers = random.sample(customer_ids, int(len(customer_ids) * 0.2))
-    customer_pool = customer_ids + frequent_customers * 2
-    
-    for i in range(NUM_TRANSACTIONS):
-        trans_date = start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
-        
-        # 営業時間内にランダムな時間を生成（9:00-23:00）
-        trans_time = trans_date.replace(
-            hour=random.randint(9, 22),
-            minute=random.randint(0, 59),
-            second=random.randint(0, 59)
-        )
-        
-        total_amount = round(random.uniform(500, 15000), 0)  # 日本円
-        discount_amount = round(total_amount * random.uniform(0, 0.15), 0) if random.random() > 0.6 else 0
-        
-        transactions.append({
-            'transaction_id': f'TRX{i+1:010d}',
-            'customer_id': random.choice(customer_pool),
-            'transaction_date': trans_date.date(),
-            'transaction_time': trans_time.time(),
-            'store_id': random.choice(stores_df['store_id'].values),
-            'cashier_id': f'CSH{random.randint(1, 200):04d}',
-            'payment_method': random.choice(payment_methods),
-            'total_amount_jpy': int(total_amount),
-            'discount_amount_jpy': int(discount_amount),
-            'tax_amount_jpy': int((total_amount - discount_amount) * 0.10),  # 消費税10%
-            'waon_points_used': random.choice([0, 0, 0, random.randint(10, 500)]),
-            'waon_points_earned': int((total_amount - discount_amount) * 0.005),  # 0.5%ポイント還元
-            'coupon_id': f'COUP{random.randint(1, 500):05d}' if random.random() > 0.8 else None,
-            'receipt_number': f'RCP{i+1:012d}'
-        })
-        
-        if (i + 1) % 50000 == 0:
-            print(f'  トランザクション生成中: {i+1}/{NUM_TRANSACTIONS}')
-    
-    return pd.DataFrame(transactions)
+
+    # 20%の顧客が60%の取引を行うというパレートの法則を適用。
+    # プールの連結（3倍のID配列）を作らず、確率ベクトルで直接抽選する
+    customer_ids = customers_df['customer_id'].to_numpy()
+    weights = np.ones(len(customer_ids))
+    frequent_idx = rng.choice(len(customer_ids), size=int(len(customer_ids) * 0.2), replace=False)
+    weights[frequent_idx] = 3.0
+    customer_probs = weights / weights.sum()
+
+    # 営業時間内（9:00-23:00）のタイムスタンプをdatetime64演算で一括生成
+    base = np.datetime64(start_date)
+    day_off = rng.integers(0, span_days + 1, size=n).astype('timedelta64[D]')
+    sec_off = (rng.integers(9, 23, size=n) * 3600
+               + rng.integers(0, 60, size=n) * 60
+               + rng.integers(0, 60, size=n)).astype('timedelta64[s]')
+    trans_dt = base + day_off + sec_off
+
+    total_amount = rng.uniform(500, 15000, size=n).round(0).astype(int)  # 日本円
+    discount_amount = np.where(
+        rng.random(n) > 0.6,
+        (total_amount * rng.uniform(0, 0.15, size=n)).round(0),
+        0,
+    ).astype(int)
+
+    coupon_id = _padded_ids('COUP', rng.integers(1, 501, size=n), 5).astype(object)
+    coupon_id[rng.random(n) <= 0.8] = None
+
+    seq = np.arange(1, n + 1)
+
+    return pd.DataFrame({
+        'transaction_id': _padded_ids('TRX', seq, 10),
+        'customer_id': customer_ids[rng.choice(len(customer_ids), size=n, p=customer_probs)],
+        # Pythonのdate/timeオブジェクト列ではなくdatetime64/timedelta64の
+        # ネイティブ列として保持する（メモリ約1/8、Parquetにもそのまま載る）
+        'transaction_date': trans_dt.astype('datetime64[D]'),
+        'transaction_time': (trans_dt - trans_dt.astype('datetime64[D]')).astype('timedelta64[s]'),
+        'store_id': stores_df['store_id'].to_numpy()[rng.integers(0, len(stores_df), size=n)],
+        'cashier_id': _padded_ids('CSH', rng.integers(1, 201, size=n), 4),
+        'payment_method': rng.choice(payment_methods, size=n),
+        'total_amount_jpy': total_amount,
+        'discount_amount_jpy': discount_amount,
+        'tax_amount_jpy': ((total_amount - discount_amount) * 0.10).astype(int),  # 消費税10%
+        'waon_points_used': np.where(rng.random(n) < 0.25, rng.integers(10, 501, size=n), 0),
+        'waon_points_earned': ((total_amount - discount_amount) * 0.005).astype(int),  # 0.5%ポイント還元
+        'coupon_id': coupon_id,
+        'receipt_number': _padded_ids('RCP', seq, 12),
+    }).astype({
+        'store_id': 'category', 'payment_method': 'category',
+        'total_amount_jpy': 'int32', 'discount_amount_jpy': 'int32',
+        'tax_amount_jpy': 'int32', 'waon_points_used': 'int32',
+        'waon_points_earned': 'int32',
+    })
 
 # ==================== トランザクション明細テーブル生成 ====================
-def generate_transaction_items(transactions_df, products_df):
-    items = []
-    
-    # 各トランザクションに対して1-10個の商品明細を生成
-    transaction_count = 0
-    for _, trans in transactions_df.iterrows():
-        num_items = random.randint(1, 10)
-        selected_products = products_df.sample(n=min(num_items, len(products_df)))
-        
-        for idx, product in selected_products.iterrows():
-            quantity = random.randint(1, 5)
-            unit_price = product['retail_price_jpy']
-            original_price = unit_price
-            
-            # ランダムに割引を適用
-            if random.random() > 0.75:
-                discount_price = round(unit_price * random.uniform(0.7, 0.95), 0)
-            else:
-                discount_price = unit_price
-            
-            line_total = int(discount_price * quantity)
-            
-            items.append({
-                'transaction_item_id': f'TI{len(items)+1:010d}',
-                'transaction_id': trans['transaction_id'],
-                'product_id': product['product_id'],
-                'product_barcode': f'49{random.randint(10000000000, 99999999999)}',  # JAN code format
-                'quantity': quantity,
-                'unit_price_jpy': int(unit_price),
-                'original_price_jpy': int(original_price),
-                'discount_price_jpy': int(discount_price),
-                'line_total_jpy': line_total,
-                'promotion_id': f'PROMO{random.randint(1, NUM_PROMOTIONS):05d}' if random.random() > 0.8 else None,
-                'return_flag': 1 if random.random() > 0.98 else 0
-            })
-            
-            if len(items) >= NUM_TRANSACTION_ITEMS:
-                break
-        
-        transaction_count += 1
-        if transaction_count % 50000 == 0:
-            print(f'  トランザクション明細生成中: {len(items)}/{NUM_TRANSACTION_ITEMS}')
-        
-        if len(items) >= NUM_TRANSACTION_ITEMS:
-            break
-    
-    return pd.DataFrame(items)
+# 明細生成のチャンク幅（取引数単位。明細は平均5.5点/取引 ≒ 27.5万行/チャンク）
+_ITEMS_CHUNK_TRANSACTIONS = 50000
+
+
+def _transaction_item_chunk(trans_ids, counts, prod_ids, prod_prices, id_offset):
+    """1チャンク分の取引明細を列単位で生成する。
+
+    商品列はpandasの行単位インデックスを避け、呼び出し元で
+    to_numpy済みの配列を整数インデックスで直接引く。
+    """
+    n = int(counts.sum())
+    # 商品は全明細分を一括サンプリング（取引内の重複は1-10点の抽選では実質無視できる）
+    prod_idx = rng.integers(0, len(prod_ids), size=n)
+    unit_price = prod_prices[prod_idx]
+
+    quantity = rng.integers(1, 6, size=n, dtype=np.int8)
+    # ランダムに割引を適用
+    discount_price = np.where(
+        rng.random(n) > 0.75,
+        (unit_price * rng.uniform(0.7, 0.95, size=n)).round(0),
+        unit_price,
+    ).astype(np.int32)
+
+    promotion_id = _padded_ids('PROMO', rng.integers(1, NUM_PROMOTIONS + 1, size=n), 5).astype(object)
+    promotion_id[rng.random(n) <= 0.8] = None
+
+    seq = np.arange(id_offset + 1, id_offset + n + 1)
+    return pd.DataFrame({
+        'transaction_item_id': _padded_ids('TI', seq, 10),
+        'transaction_id': np.repeat(trans_ids, counts),
+        'product_id': prod_ids[prod_idx],
+        'product_barcode': np.char.add('49', rng.integers(10000000000, 10**11, size=n).astype(str)),  # JAN code format
+        'quantity': quantity,
+        'unit_price_jpy': unit_price.astype(np.int32),
+        'original_price_jpy': unit_price.astype(np.int32),
+        'discount_price_jpy': discount_price,
+        'line_total_jpy': discount_price * quantity,
+        'promotion_id': promotion_id,
+        'return_flag': (rng.random(n) > 0.98).astype(np.int8),
+    })
+
+
+def generate_transaction_items(transactions_df, products_df, parquet_path=None):
+    """取引明細を生成する。
+
+    parquet_pathを指定すると、チャンクごとにRecordBatchへ変換して
+    pyarrow.parquet.ParquetWriterに逐次書き込む。巨大テーブルを
+    後からもう一度シリアライズし直す必要がなくなる。
+    """
+    # 各トランザクションの明細数（1-10）をまとめて引き、
+    # 累積和でNUM_TRANSACTION_ITEMSの上限に解析的に打ち切る
+    counts = rng.integers(1, 11, size=len(transactions_df))
+    cum = counts.cumsum()
+    last = np.searchsorted(cum, NUM_TRANSACTION_ITEMS, side='left')
+    if last < len(counts):
+        counts[last] = NUM_TRANSACTION_ITEMS - (cum[last - 1] if last > 0 else 0)
+        counts = counts[:last + 1]
+
+    trans_ids = transactions_df['transaction_id'].to_numpy()[:len(counts)]
+    # 商品ID・価格はループ外で一度だけnumpy配列に取り出す
+    prod_ids = products_df['product_id'].to_numpy()
+    prod_prices = products_df['retail_price_jpy'].to_numpy()
+
+    chunk_frames = []
+    writer = None
+    id_offset = 0
+    try:
+        for start in range(0, len(counts), _ITEMS_CHUNK_TRANSACTIONS):
+            counts_chunk = counts[start:start + _ITEMS_CHUNK_TRANSACTIONS]
+            chunk = _transaction_item_chunk(
+                trans_ids[start:start + _ITEMS_CHUNK_TRANSACTIONS],
+                counts_chunk, prod_ids, prod_prices, id_offset,
+            )
+            if parquet_path is not None:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(
+                        parquet_path, batch.schema,
+                        compression='snappy', use_dictionary=True,
+                    )
+                writer.write_batch(batch)
+            chunk_frames.append(chunk)
+            id_offset += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return pd.concat(chunk_frames, ignore_index=True)
 
 # ==================== 在庫テーブル生成 ====================
 def generate_inventory(products_df, stores_df):
-    inventory = []
-    inventory_id = 1
-    
-    print("  在庫データ生成中...")
-    
-    # 各店舗に部分的な商品の在庫を生成（全商品ではない）
-    for idx, store_id in enumerate(stores_df['store_id']):
-        # 各店舗はランダムに70-90%の商品を在庫
-        num_products = int(len(products_df) * random.uniform(0.7, 0.9))
-        selected_products = products_df.sample(n=num_products)
-        
-        for _, product in selected_products.iterrows():
-            stock_qty = random.randint(0, 800)
-            reorder_point = random.randint(50, 200)
-            
-            inventory.append({
-                'inventory_id': f'INV{inventory_id:08d}',
-                'product_id': product['product_id'],
-                'store_id': store_id,
-                'stock_quantity': stock_qty,
-                'reorder_point': reorder_point,
-                'max_stock_level': reorder_point * 5,
-                'last_restock_date': fake.date_between(start_date='-30d', end_date='today'),
-                'expiry_date': fake.date_between(start_date='today', end_date='+180d') if product['perishable_flag'] else None,
-                'shelf_location': f'{random.choice(["A", "B", "C", "D", "E", "F"])}-{random.randint(1, 30):02d}-{random.randint(1, 8):02d}',
-                'days_on_shelf': random.randint(1, 90)
-            })
-            inventory_id += 1
-        
-        if (idx + 1) % 10 == 0:
-            print(f'    店舗 {idx + 1}/{len(stores_df)} 完了')
-    
-    return pd.DataFrame(inventory)
+
+    product_ids = products_df['product_id'].to_numpy()
+    perishable_flags = products_df['perishable_flag'].to_numpy()
+    store_ids = stores_df['store_id'].to_numpy()
+
+    # 各店舗に部分的な商品の在庫を生成（全商品ではない）。
+    # 各店舗はランダムに70-90%の商品を在庫する。
+    # 店舗ごとの非復元抽選は(店舗数×商品数)の乱数行列をargsortし、
+    # 各行の先頭k件を採用することで全店舗分を一括で行う
+    num_per_store = (len(products_df) * rng.uniform(0.7, 0.9, size=len(store_ids))).astype(int)
+    order = rng.random((len(store_ids), len(products_df))).argsort(axis=1)
+    prod_idx = order[np.arange(len(products_df)) < num_per_store[:, None]]
+    store_rep = np.repeat(store_ids, num_per_store)
+    n = prod_idx.size
+
+    reorder_point = rng.integers(50, 201, size=n)
+    today = np.datetime64('today')
+
+    # 賞味期限は生鮮食品のみ、それ以外はNaT
+    expiry_date = pd.Series(
+        today + rng.integers(0, 181, size=n).astype('timedelta64[D]')
+    ).where(perishable_flags[prod_idx] == 1)
+
+    shelf_location = np.char.add(
+        np.char.add(rng.choice(['A', 'B', 'C', 'D', 'E', 'F'], size=n), '-'),
+        np.char.add(
+            np.char.add(np.char.zfill(rng.integers(1, 31, size=n).astype(str), 2), '-'),
+            np.char.zfill(rng.integers(1, 9, size=n).astype(str), 2)
+        )
+    )
+
+    return pd.DataFrame({
+        'inventory_id': _padded_ids('INV', np.arange(1, n + 1), 8),
+        'product_id': product_ids[prod_idx],
+        'store_id': store_rep,
+        'stock_quantity': rng.integers(0, 801, size=n),
+        'reorder_point': reorder_point,
+        'max_stock_level': reorder_point * 5,
+        'last_restock_date': today - rng.integers(0, 31, size=n).astype('timedelta64[D]'),
+        'expiry_date': expiry_date,
+        'shelf_location': shelf_location,
+        'days_on_shelf': rng.integers(1, 91, size=n),
+    }).astype({
+        'store_id': 'category', 'stock_quantity': 'int16', 'reorder_point': 'int16',
+        'max_stock_level': 'int16', 'days_on_shelf': 'int8',
+    })
 
 # ==================== 祝日テーブル生成 ====================
 def generate_holidays():
+    # 列名を行ごとに繰り返すdictのリストではなく、タプルのリストと
+    # from_recordsで構築する（キーの重複保持と行ごとの列整列を省ける）
     holidays = [
-        {'date': '2024-01-01', 'holiday_name': '元日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-01-08', 'holiday_name': '成人の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-02-11', 'holiday_name': '建国記念の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2024-02-23', 'holiday_name': '天皇誕生日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2024-03-20', 'holiday_name': '春分の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2024-04-29', 'holiday_name': '昭和の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-05-03', 'holiday_name': '憲法記念日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-05-04', 'holiday_name': 'みどりの日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-05-05', 'holiday_name': 'こどもの日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-07-15', 'holiday_name': '海の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-08-11', 'holiday_name': '山の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-09-16', 'holiday_name': '敬老の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-09-22', 'holiday_name': '秋分の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2024-10-14', 'holiday_name': 'スポーツの日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2024-11-03', 'holiday_name': '文化の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2024-11-23', 'holiday_name': '勤労感謝の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2025-01-01', 'holiday_name': '元日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-01-13', 'holiday_name': '成人の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-02-11', 'holiday_name': '建国記念の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2025-02-23', 'holiday_name': '天皇誕生日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2025-03-20', 'holiday_name': '春分の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2025-04-29', 'holiday_name': '昭和の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-05-03', 'holiday_name': '憲法記念日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-05-04', 'holiday_name': 'みどりの日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-05-05', 'holiday_name': 'こどもの日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-07-21', 'holiday_name': '海の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-08-11', 'holiday_name': '山の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-09-15', 'holiday_name': '敬老の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
-        {'date': '2025-09-23', 'holiday_name': '秋分の日', 'holiday_type': '国民の祝日', 'is_long_weekend': 0},
-        {'date': '2025-10-13', 'holiday_name': 'スポーツの日', 'holiday_type': '国民の祝日', 'is_long_weekend': 1},
+        ('2024-01-01', '元日', '国民の祝日', 1),
+        ('2024-01-08', '成人の日', '国民の祝日', 1),
+        ('2024-02-11', '建国記念の日', '国民の祝日', 0),
+        ('2024-02-23', '天皇誕生日', '国民の祝日', 0),
+        ('2024-03-20', '春分の日', '国民の祝日', 0),
+        ('2024-04-29', '昭和の日', '国民の祝日', 1),
+        ('2024-05-03', '憲法記念日', '国民の祝日', 1),
+        ('2024-05-04', 'みどりの日', '国民の祝日', 1),
+        ('2024-05-05', 'こどもの日', '国民の祝日', 1),
+        ('2024-07-15', '海の日', '国民の祝日', 1),
+        ('2024-08-11', '山の日', '国民の祝日', 1),
+        ('2024-09-16', '敬老の日', '国民の祝日', 1),
+        ('2024-09-22', '秋分の日', '国民の祝日', 0),
+        ('2024-10-14', 'スポーツの日', '国民の祝日', 1),
+        ('2024-11-03', '文化の日', '国民の祝日', 0),
+        ('2024-11-23', '勤労感謝の日', '国民の祝日', 0),
+        ('2025-01-01', '元日', '国民の祝日', 1),
+        ('2025-01-13', '成人の日', '国民の祝日', 1),
+        ('2025-02-11', '建国記念の日', '国民の祝日', 0),
+        ('2025-02-23', '天皇誕生日', '国民の祝日', 0),
+        ('2025-03-20', '春分の日', '国民の祝日', 0),
+        ('2025-04-29', '昭和の日', '国民の祝日', 1),
+        ('2025-05-03', '憲法記念日', '国民の祝日', 1),
+        ('2025-05-04', 'みどりの日', '国民の祝日', 1),
+        ('2025-05-05', 'こどもの日', '国民の祝日', 1),
+        ('2025-07-21', '海の日', '国民の祝日', 1),
+        ('2025-08-11', '山の日', '国民の祝日', 1),
+        ('2025-09-15', '敬老の日', '国民の祝日', 1),
+        ('2025-09-23', '秋分の日', '国民の祝日', 0),
+        ('2025-10-13', 'スポーツの日', '国民の祝日', 1),
     ]
-    
-    return pd.DataFrame(holidays)
+
+    df = pd.DataFrame.from_records(
+        holidays, columns=['date', 'holiday_name', 'holiday_type', 'is_long_weekend']
+    )
+    # 文字列のままではなく生成時点でdatetime64へ一括変換しておく
+    # （下流の結合・分析で行ごとの再パースが不要になる）
+    df['date'] = pd.to_datetime(df['date'])
+    df['is_long_weekend'] = df['is_long_weekend'].astype('int8')
+    return df
+
+
+# ==================== 日付ディメンションテーブル生成 ====================
+def generate_dates_dim(holidays_df):
+    """曜日・週末・祝日フラグ付きの日付ディメンションを生成する。
+
+    祝日結合を生成時に済ませておくことで、下流の分析が
+    毎回同じ結合をやり直さずに済む。
+    """
+    dates = pd.DataFrame({'date': pd.date_range('2024-01-01', '2025-12-31')})
+    dates['day_of_week'] = dates['date'].dt.dayofweek.astype('int8')
+    dates['is_weekend'] = (dates['day_of_week'] >= 5).astype('int8')
+    dates = dates.merge(holidays_df[['date', 'holiday_name']], how='left', on='date')
+    dates['is_holiday'] = dates['holiday_name'].notna().astype('int8')
+    return dates
 
 # ==================== 天気テーブル生成 ====================
 def generate_weather(stores_df):
-    weather_data = []
-    
-    start_date = datetime(2024, 5, 1)
-    end_date = datetime(2025, 10, 31)
-    
     weather_conditions = ['晴れ', '曇り', '雨', '小雨', '大雨', '雪', '強風']
-    
+
     # 各店舗の都道府県で天気データを生成
     prefectures = stores_df['prefecture'].unique()
-    
-    print("  天気データ生成中...")
-    
-    current_date = start_date
-    day_count = 0
-    while current_date <= end_date:
-        for prefecture in prefectures:
-            # 季節に応じた温度範囲
-            month = current_date.month
-            if month in [12, 1, 2]:  # 冬
-                temp_range = (-2, 12)
-            elif month in [3, 4, 5]:  # 春
-                temp_range = (8, 22)
-            elif month in [6, 7, 8]:  # 夏
-                temp_range = (22, 36)
-            else:  # 秋
-                temp_range = (12, 25)
-            
-            weather_data.append({
-                'date': current_date.date(),
-                'prefecture': prefecture,
-                'temperature_celsius': round(random.uniform(temp_range[0], temp_range[1]), 1),
-                'weather_condition': random.choice(weather_conditions),
-                'humidity_percent': random.randint(40, 90),
-                'precipitation_mm': round(random.uniform(0, 50), 1) if random.random() > 0.7 else 0
-            })
-        
-        current_date += timedelta(days=1)
-        day_count += 1
-        if day_count % 100 == 0:
-            print(f'    {day_count}日分完了')
-    
-    return pd.DataFrame(weather_data)
+
+
+    # (日付 × 都道府県)の直積をrepeat/tileで構築し、
+    # 季節に応じた温度範囲は月別LUTのブロードキャストで引く
+    dates = np.arange(np.datetime64('2024-05-01'), np.datetime64('2025-11-01'), dtype='datetime64[D]')
+    months = dates.astype('datetime64[M]').astype(int) % 12 + 1
+
+    # index=月（1-12）: 冬(-2,12) / 春(8,22) / 夏(22,36) / 秋(12,25)
+    temp_low = np.array([0, -2, -2, 8, 8, 8, 22, 22, 22, 12, 12, 12, -2], dtype=float)
+    temp_high = np.array([0, 12, 12, 22, 22, 22, 36, 36, 36, 25, 25, 25, 12], dtype=float)
+
+    all_dates = np.repeat(dates, len(prefectures))
+    month_rep = np.repeat(months, len(prefectures))
+    n = all_dates.size
+
+    return pd.DataFrame({
+        'date': all_dates,
+        'prefecture': np.tile(prefectures, len(dates)),
+        'temperature_celsius': rng.uniform(temp_low[month_rep], temp_high[month_rep]).round(1),
+        'weather_condition': rng.choice(weather_conditions, size=n),
+        'humidity_percent': rng.integers(40, 91, size=n),
+        'precipitation_mm': np.where(rng.random(n) > 0.7, rng.uniform(0, 50, size=n).round(1), 0),
+    }).astype({
+        'prefecture': 'category', 'weather_condition': 'category', 'humidity_percent': 'int8',
+    })
 
 # ==================== 顧客行動テーブル生成 ====================
 def generate_customer_behavior(customers_df, transactions_df):
-    behavior = []
-    
-    print("  顧客行動データ生成中...")
-    
-    for idx, customer_id in enumerate(customers_df['customer_id']):
-        customer_trans = transactions_df[transactions_df['customer_id'] == customer_id]
-        
-        if len(customer_trans) > 0:
-            avg_basket = round(customer_trans['total_amount_jpy'].mean(), 0)
-            purchase_freq = len(customer_trans)
-            last_purchase = customer_trans['transaction_date'].max()
-            days_since = (datetime(2025, 10, 31).date() - pd.to_datetime(last_purchase).date()).days
-        else:
-            avg_basket = 0
-            purchase_freq = 0
-            last_purchase = None
-            days_since = 999
-        
-        behavior.append({
-            'customer_id': customer_id,
-            'avg_basket_size': round(random.uniform(3, 20), 1),
-            'avg_transaction_value_jpy': int(avg_basket) if avg_basket > 0 else int(random.uniform(1000, 8000)),
-            'purchase_frequency': purchase_freq,
-            'last_purchase_date': last_purchase,
-            'days_since_last_purchase': days_since,
-            'preferred_categories': random.choice(['食品', '日用品', 'ヘルスケア・ビューティー', '食品,日用品']),
-            'price_sensitivity': random.choice(['低', '中', '高']),
-            'promotion_response_rate': round(random.uniform(0.1, 0.8), 2),
-            'channel_preference': random.choice(['店舗', 'オンライン', 'オムニチャネル']),
-            'churn_risk_score': round(random.uniform(0, 1), 3)
-        })
-        
-        if (idx + 1) % 10000 == 0:
-            print(f'    {idx + 1}/{len(customers_df)} 顧客完了')
-    
-    return pd.DataFrame(behavior)
+
+    # 顧客ごとにトランザクションをフィルタするO(顧客数×取引数)の走査を、
+    # 単一のgroupby集計＋顧客IDへのreindexに置き換える
+    agg = transactions_df.groupby('customer_id', sort=False).agg(
+        avg_basket=('total_amount_jpy', 'mean'),
+        purchase_freq=('transaction_id', 'size'),
+        last_purchase=('transaction_date', 'max'),
+    ).reindex(customers_df['customer_id'])
+
+    n = len(customers_df)
+    purchase_freq = agg['purchase_freq'].fillna(0).astype(int).to_numpy()
+    last_purchase = pd.to_datetime(agg['last_purchase'])
+    days_since = (pd.Timestamp(2025, 10, 31) - last_purchase).dt.days
+    days_since = days_since.fillna(999).astype(int).to_numpy()
+
+    # 取引のない顧客はランダムな平均取引額でフォールバック
+    avg_basket = agg['avg_basket'].round(0).fillna(0).to_numpy()
+    avg_transaction_value = np.where(
+        purchase_freq > 0, avg_basket, rng.uniform(1000, 8000, size=n)
+    ).astype(int)
+
+    return pd.DataFrame({
+        'customer_id': customers_df['customer_id'].to_numpy(),
+        'avg_basket_size': rng.uniform(3, 20, size=n).round(1),
+        'avg_transaction_value_jpy': avg_transaction_value,
+        'purchase_frequency': purchase_freq,
+        'last_purchase_date': agg['last_purchase'].to_numpy(),
+        'days_since_last_purchase': days_since,
+        'preferred_categories': rng.choice(['食品', '日用品', 'ヘルスケア・ビューティー', '食品,日用品'], size=n),
+        'price_sensitivity': rng.choice(['低', '中', '高'], size=n),
+        'promotion_response_rate': rng.uniform(0.1, 0.8, size=n).round(2),
+        'channel_preference': rng.choice(['店舗', 'オンライン', 'オムニチャネル'], size=n),
+        'churn_risk_score': rng.uniform(0, 1, size=n).round(3),
+    }).astype({
+        'preferred_categories': 'category', 'price_sensitivity': 'category',
+        'channel_preference': 'category', 'avg_transaction_value_jpy': 'int32',
+        'purchase_frequency': 'int32', 'days_since_last_purchase': 'int32',
+    })
 
 # ==================== メイン関数 ====================
+def _excel_display_frame(df):
+    """Excel出力用の表示変換を行ったコピーを返す。
+
+    to_excelはtimedelta64列を「日数比の小数」に変換してしまい
+    transaction_timeが0/1にしか見えなくなるため、互換ワークブック
+    側だけtime型へ直す。Parquet側はネイティブ型のまま。
+    """
+    td_cols = df.select_dtypes(include='timedelta64').columns
+    if td_cols.empty:
+        return df
+    out = df.copy(deep=False)
+    for col in td_cols:
+        out[col] = (pd.Timestamp(0) + out[col]).dt.time
+    return out
+
+
+def _run_seeded(seed_seq, func_name, *args):
+    """ワーカープロセス内でモジュールRNGを子シードに差し替えて実行する。
+
+    SeedSequence(42)から派生した固有のシード列を使うため、
+    並列実行しても結果は決定的になる。
+    """
+    global rng
+    rng = np.random.default_rng(seed_seq)
+    return globals()[func_name](*args)
+
+
+
 def main():
     print("=" * 70)
     print("イオン東京圏スーパーマーケット販売データ生成開始")
     print("=" * 70)
-    
-    print("\n[1/10] 店舗データ生成中...")
-    stores_df = generate_stores()
-    print(f"  ✓ 完了: {len(stores_df)}店舗")
-    
-    print("\n[2/10] 商品データ生成中...")
-    products_df = generate_products()
-    print(f"  ✓ 完了: {len(products_df)}商品")
-    
-    print("\n[3/10] 顧客データ生成中...")
-    customers_df = generate_customers()
-    print(f"  ✓ 完了: {len(customers_df)}顧客")
-    
-    print("\n[4/10] プロモーションデータ生成中...")
-    promotions_df = generate_promotions()
-    print(f"  ✓ 完了: {len(promotions_df)}プロモーション")
-    
-    print("\n[5/10] トランザクションデータ生成中...")
-    transactions_df = generate_transactions(customers_df, stores_df)
-    print(f"  ✓ 完了: {len(transactions_df):,}トランザクション")
-    
-    print("\n[6/10] トランザクション明細データ生成中...")
-    transaction_items_df = generate_transaction_items(transactions_df, products_df)
-    print(f"  ✓ 完了: {len(transaction_items_df):,}明細")
-    
-    print("\n[7/10] 在庫データ生成中...")
-    inventory_df = generate_inventory(products_df, stores_df)
-    print(f"  ✓ 完了: {len(inventory_df):,}在庫レコード")
-    
-    print("\n[8/10] 祝日データ生成中...")
-    holidays_df = generate_holidays()
-    print(f"  ✓ 完了: {len(holidays_df)}祝日")
-    
-    print("\n[9/10] 天気データ生成中...")
-    weather_df = generate_weather(stores_df)
-    print(f"  ✓ 完了: {len(weather_df):,}天気レコード")
-    
-    print("\n[10/10] 顧客行動データ生成中...")
-    customer_behavior_df = generate_customer_behavior(customers_df, transactions_df)
-    print(f"  ✓ 完了: {len(customer_behavior_df):,}顧客行動レコード")
-    
-    # Excelファイルに保存（各テーブルを別シートに）
-    print("\n" + "=" * 70)
-    print("Excelファイルに保存中...")
-    print("=" * 70)
+
     output_file = 'data/uploaded/lumi_tokyo_sales_data.xlsx'
-    
+    parquet_dir = 'data/uploaded/parquet'
+
     # ディレクトリが存在しない場合は作成
     import os
     os.makedirs('data/uploaded', exist_ok=True)
+    os.makedirs(parquet_dir, exist_ok=True)
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        stores_df.to_excel(writer, sheet_name='店舗', index=False)
-        products_df.to_excel(writer, sheet_name='商品', index=False)
-        customers_df.to_excel(writer, sheet_name='顧客', index=False)
-        transactions_df.to_excel(writer, sheet_name='トランザクション', index=False)
-        transaction_items_df.to_excel(writer, sheet_name='トランザクション明細', index=False)
-        promotions_df.to_excel(writer, sheet_name='プロモーション', index=False)
-        inventory_df.to_excel(writer, sheet_name='在庫', index=False)
-        holidays_df.to_excel(writer, sheet_name='祝日', index=False)
-        weather_df.to_excel(writer, sheet_name='天気', index=False)
-        customer_behavior_df.to_excel(writer, sheet_name='顧客行動', index=False)
-    
-    print(f"\n✓ Excelファイル生成完了: {output_file}")
+    # 依存関係のない（少ない）ジェネレーターをステージごとに
+    # ProcessPoolExecutorで並列実行する。各ワーカーは
+    # SeedSequence(42).spawn()の固有シードでRNGを初期化する
+    from concurrent.futures import ProcessPoolExecutor
+
+    seeds = np.random.SeedSequence(42).spawn(10)
+
+    with ProcessPoolExecutor() as executor:
+        # ステージ1: 入力テーブルに依存しないジェネレーター
+        print("\n[ステージ1] 店舗・商品・顧客・プロモーション・祝日データ生成中...")
+        f_stores = executor.submit(_run_seeded, seeds[0], 'generate_stores')
+        f_products = executor.submit(_run_seeded, seeds[1], 'generate_products')
+        f_customers = executor.submit(_run_seeded, seeds[2], 'generate_customers')
+        f_promotions = executor.submit(_run_seeded, seeds[3], 'generate_promotions')
+        f_holidays = executor.submit(_run_seeded, seeds[4], 'generate_holidays')
+        stores_df = f_stores.result()
+        products_df = f_products.result()
+        customers_df = f_customers.result()
+        promotions_df = f_promotions.result()
+        holidays_df = f_holidays.result()
+        dates_dim_df = generate_dates_dim(holidays_df)
+        print(f"  ✓ 完了: {len(stores_df)}店舗 / {len(products_df)}商品 / "
+              f"{len(customers_df):,}顧客 / {len(promotions_df)}プロモーション / {len(holidays_df)}祝日")
+
+        # ステージ2: 店舗・顧客に依存
+        print("\n[ステージ2] トランザクション・天気・在庫データ生成中...")
+        f_transactions = executor.submit(_run_seeded, seeds[5], 'generate_transactions',
+                                         customers_df, stores_df)
+        f_weather = executor.submit(_run_seeded, seeds[6], 'generate_weather', stores_df)
+        f_inventory = executor.submit(_run_seeded, seeds[7], 'generate_inventory',
+                                      products_df, stores_df)
+        transactions_df = f_transactions.result()
+        weather_df = f_weather.result()
+        inventory_df = f_inventory.result()
+        print(f"  ✓ 完了: {len(transactions_df):,}トランザクション / "
+              f"{len(weather_df):,}天気レコード / {len(inventory_df):,}在庫レコード")
+
+        # ステージ3: トランザクションに依存
+        print("\n[ステージ3] トランザクション明細・顧客行動データ生成中...")
+        # 明細は生成と同時にチャンク単位でParquetへストリーム書き込み
+        f_items = executor.submit(_run_seeded, seeds[8], 'generate_transaction_items',
+                                  transactions_df, products_df,
+                                  f'{parquet_dir}/transaction_items.parquet')
+        f_behavior = executor.submit(_run_seeded, seeds[9], 'generate_customer_behavior',
+                                     customers_df, transactions_df)
+        transaction_items_df = f_items.result()
+        customer_behavior_df = f_behavior.result()
+        print(f"  ✓ 完了: {len(transaction_items_df):,}明細 / "
+              f"{len(customer_behavior_df):,}顧客行動レコード")
+    
+    # ファイルに保存（Parquetを主出力、Excelは互換用に各テーブルを別シートに）
+    print("\n" + "=" * 70)
+    print("ファイルに保存中...")
+    print("=" * 70)
+    tables = [
+        ('店舗', 'stores', stores_df),
+        ('商品', 'products', products_df),
+        ('顧客', 'customers', customers_df),
+        ('トランザクション', 'transactions', transactions_df),
+        ('トランザクション明細', 'transaction_items', transaction_items_df),
+        ('プロモーション', 'promotions', promotions_df),
+        ('在庫', 'inventory', inventory_df),
+        ('祝日', 'holidays', holidays_df),
+        ('日付', 'dates', dates_dim_df),
+        ('天気', 'weather', weather_df),
+        ('顧客行動', 'customer_behavior', customer_behavior_df),
+    ]
+
+    # 主出力: Parquet（列指向＋Snappy圧縮。Excelより桁違いに高速・小容量）
+    # トランザクション明細は生成時にストリーム書き込み済み
+    for _, name, df in tables:
+        if name == 'transaction_items':
+            continue
+        df.to_parquet(f'{parquet_dir}/{name}.parquet', engine='pyarrow',
+                      compression='snappy', index=False)
+    print(f"✓ Parquet出力完了: {parquet_dir}/")
+
+    # 互換用: Excel。全件の正はParquetとし、各シートは目視確認用の
+    # 先頭サンプルのみ載せる（明細150万行はExcelの行上限104万を超える）。
+    # xlsxwriterがあれば高速な標準モードで書き込む
+    # （constant_memoryは行を確定順にフラッシュするため、to_excelの
+    # 列単位書き込みとは両立しない）
+    try:
+        import xlsxwriter  # noqa: F401
+        writer_kwargs = {'engine': 'xlsxwriter'}
+    except ImportError:
+        writer_kwargs = {'engine': 'openpyxl'}
+
+    with pd.ExcelWriter(output_file, **writer_kwargs) as writer:
+        for sheet_name, _, df in tables:
+            _excel_display_frame(df.head(EXCEL_SAMPLE_ROWS)).to_excel(
+                writer, sheet_name=sheet_name, index=False)
+
+    print(f"\n✓ Excelファイル生成完了（各シート最大{EXCEL_SAMPLE_ROWS:,}行のサンプル）: {output_file}")
     print("\n" + "=" * 70)
     print("データ統計サマリー")
     print("=" * 70)
@@ -560,6 +750,7 @@ def main():
     print(f"  🎉 プロモーションテーブル:    {len(promotions_df):>10,} レコード")
     print(f"  📊 在庫テーブル:              {len(inventory_df):>10,} レコード")
     print(f"  🎌 祝日テーブル:              {len(holidays_df):>10,} レコード")
+    print(f"  📅 日付テーブル:              {len(dates_dim_df):>10,} レコード")
     print(f"  ⛅ 天気テーブル:              {len(weather_df):>10,} レコード")
     print(f"  📈 顧客行動テーブル:          {len(customer_behavior_df):>10,} レコード")
     print("=" * 70)
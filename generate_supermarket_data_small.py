@@ -20,6 +20,8 @@
 使用方法:
   python generate_supermarket_data_small.py [出力ファイルパス]
   例: python generate_supermarket_data_small.py data/uploaded/small_test.xlsx
+  拡張子を .parquet / .feather にすると（または SMALL_OUT_FORMAT で指定すると）
+  Excel の代わりにシートごとのカラムナファイルを出力する（CI・テスト用高速パス）。
 
 オプション環境変数で規模調整可能:
   SMALL_NUM_STORES, SMALL_NUM_PRODUCTS, SMALL_NUM_CUSTOMERS, SMALL_NUM_TRANSACTIONS, SMALL_NUM_ITEMS
@@ -27,14 +29,13 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import os
 import sys
 
-# 固定シードで再現性
-random.seed(123)
-np.random.seed(123)
+# 固定シードで再現性（乱数は単一の Generator に集約）
+rng = np.random.default_rng(123)
 
 # ==================== パラメータ (環境変数で上書き可) ====================
 NUM_STORES = int(os.getenv("SMALL_NUM_STORES", 3))
@@ -50,105 +51,131 @@ END_DATE = START_DATE + timedelta(days=60)  # 約2ヶ月分 (学習テスト用)
 # ==================== 生成関数 ====================
 
 def generate_stores():
-    stores = []
-    for i in range(NUM_STORES):
-        stores.append({
-            "store_id": f"S{i+1:03d}",
-            "store_name": f"テスト店舗{i+1}",
-        })
-    return pd.DataFrame(stores)
+    # 行ごとの dict 追加ではなく列単位で一括構築
+    seq = np.arange(1, NUM_STORES + 1)
+    return pd.DataFrame({
+        "store_id": np.char.mod("S%03d", seq),
+        "store_name": np.char.mod("テスト店舗%d", seq),
+    })
 
 
 def generate_products():
     categories = ["食品", "日用品", "飲料", "菓子", "ヘルスケア"]
-    products = []
-    for i in range(NUM_PRODUCTS):
-        cat = random.choice(categories)
-        price = random.randint(100, 1500)
-        cost = int(price * random.uniform(0.5, 0.8))
-        products.append({
-            "product_id": f"P{i+1:05d}",
-            "product_name": f"商品{i+1}",
-            "category_level1": cat,
-            "retail_price_jpy": price,
-            "cost_price_jpy": cost,
-        })
-    return pd.DataFrame(products)
+    prices = rng.integers(100, 1501, size=NUM_PRODUCTS)
+    seq = np.arange(1, NUM_PRODUCTS + 1)
+    return pd.DataFrame({
+        "product_id": np.char.mod("P%05d", seq),
+        "product_name": np.char.mod("商品%d", seq),
+        # 低カーディナリティ列は辞書エンコード（カテゴリ型）で保持する
+        "category_level1": pd.Categorical(rng.choice(categories, size=NUM_PRODUCTS), categories=categories),
+        "retail_price_jpy": prices,
+        "cost_price_jpy": (prices * rng.uniform(0.5, 0.8, size=NUM_PRODUCTS)).astype(int),
+    }).astype({"retail_price_jpy": "int32", "cost_price_jpy": "int32"})
 
 
 def generate_customers():
-    customers = []
-    for i in range(NUM_CUSTOMERS):
-        customers.append({
-            "customer_id": f"C{i+1:06d}",
-            "gender": random.choice(["男性", "女性"]),
-            "age": random.randint(18, 75),
-            "registration_date": (START_DATE - timedelta(days=random.randint(0, 400))).date(),
-        })
-    return pd.DataFrame(customers)
+    # 日付は Python datetime のループではなく datetime64 演算で一括生成し、
+    # object 経由の型推論を挟まず最初から datetime64 列にする
+    reg_dates = np.datetime64(START_DATE, "D") - rng.integers(0, 401, size=NUM_CUSTOMERS).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "customer_id": np.char.mod("C%06d", np.arange(1, NUM_CUSTOMERS + 1)),
+        "gender": pd.Categorical(rng.choice(["男性", "女性"], size=NUM_CUSTOMERS), categories=["男性", "女性"]),
+        "age": rng.integers(18, 76, size=NUM_CUSTOMERS),
+        "registration_date": reg_dates,
+    }).astype({"age": "int16"})
 
 
 def generate_promotions():
-    promos = []
-    for i in range(NUM_PROMOTIONS):
-        sd = START_DATE + timedelta(days=random.randint(0, (END_DATE - START_DATE).days - 5))
-        ed = sd + timedelta(days=random.randint(3, 10))
-        promos.append({
-            "promotion_id": f"PR{i+1:03d}",
-            "start_date": sd.date(),
-            "end_date": ed.date(),
-            "discount_rate": round(random.uniform(0.05, 0.30), 2),
-        })
-    return pd.DataFrame(promos)
+    span_days = (END_DATE - START_DATE).days
+    starts = np.datetime64(START_DATE, "D") + rng.integers(0, span_days - 4, size=NUM_PROMOTIONS).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "promotion_id": np.char.mod("PR%03d", np.arange(1, NUM_PROMOTIONS + 1)),
+        "start_date": starts,
+        "end_date": starts + rng.integers(3, 11, size=NUM_PROMOTIONS).astype("timedelta64[D]"),
+        "discount_rate": rng.uniform(0.05, 0.30, size=NUM_PROMOTIONS).round(2),
+    })
 
 
 def generate_transactions(customers_df, stores_df):
-    txs = []
-    customer_ids = customers_df.customer_id.tolist()
-    store_ids = stores_df.store_id.tolist()
-    for i in range(NUM_TRANSACTIONS):
-        d = START_DATE + timedelta(days=random.randint(0, (END_DATE - START_DATE).days))
-        amount = random.randint(300, 8000)
-        txs.append({
-            "transaction_id": f"T{i+1:07d}",
-            "customer_id": random.choice(customer_ids),
-            "transaction_date": d.date(),
-            "store_id": random.choice(store_ids),
-            "total_amount_jpy": amount,
-        })
-    return pd.DataFrame(txs)
+    customer_ids = customers_df["customer_id"].to_numpy()
+    store_ids = stores_df["store_id"].to_numpy()
+    span_days = (END_DATE - START_DATE).days
+    tx_dates = np.datetime64(START_DATE, "D") + rng.integers(0, span_days + 1, size=NUM_TRANSACTIONS).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "transaction_id": np.char.mod("T%07d", np.arange(1, NUM_TRANSACTIONS + 1)),
+        "customer_id": customer_ids[rng.integers(0, len(customer_ids), size=NUM_TRANSACTIONS)],
+        "transaction_date": tx_dates,
+        "store_id": pd.Categorical(store_ids[rng.integers(0, len(store_ids), size=NUM_TRANSACTIONS)], categories=store_ids),
+        # total_amount_jpy は明細生成後に line_total_jpy の集計で付与する
+    })
 
 
 def generate_transaction_items(transactions_df, products_df):
-    items = []
-    count = 0
-    for _, tx in transactions_df.iterrows():
-        # 各取引のアイテム数 (1-5)
-        n_items = random.randint(1, 5)
-        chosen = products_df.sample(n=min(n_items, len(products_df)))
-        for _, p in chosen.iterrows():
-            qty = random.randint(1, 3)
-            unit_price = p.retail_price_jpy
-            discount_price = int(unit_price * random.uniform(0.7, 1.0))
-            line_total = discount_price * qty
-            items.append({
-                "transaction_item_id": f"TI{count+1:08d}",
-                "transaction_id": tx.transaction_id,
-                "product_id": p.product_id,
-                "quantity": qty,
-                "unit_price_jpy": unit_price,
-                "discount_price_jpy": discount_price,
-                "line_total_jpy": line_total,
-            })
-            count += 1
-            if count >= MAX_ITEMS:
-                break
-        if count >= MAX_ITEMS:
-            break
-    return pd.DataFrame(items)
+    # 取引ごとの iterrows + sample ループを NumPy の一括抽選に置き換え、
+    # 列単位の配列から DataFrame を一度に構築する
+    # 各取引のアイテム数 (1-5)
+    max_k = min(5, len(products_df))
+    counts = rng.integers(1, max_k + 1, size=len(transactions_df))
+
+    # MAX_ITEMS の上限は counts を解析的に切り詰めて事前に適用する
+    # （余分な配列を作ってからスライスしない。旧実装の break 相当）
+    cum = counts.cumsum()
+    if cum[-1] > MAX_ITEMS:
+        last = int(np.searchsorted(cum, MAX_ITEMS, side="left"))
+        counts = counts[:last + 1]
+        counts[last] = MAX_ITEMS - (cum[last - 1] if last > 0 else 0)
+    total = int(counts.sum())
+
+    # 取引内の「重複なし」商品抽選を全取引まとめて実行:
+    # 乱数行列を行ごとに argpartition し、各行の先頭 counts[i] 個を採用する
+    keys = rng.random((len(counts), len(products_df)))
+    picks = np.argpartition(keys, max_k - 1, axis=1)[:, :max_k]
+    prod_idx = picks[np.arange(max_k) < counts[:, None]]
+
+    tx_rep = np.repeat(transactions_df["transaction_id"].to_numpy()[:len(counts)], counts)
+    # 生成時点で最終 dtype の型付き配列に直接書き込み、後段の astype
+    # によるコラム再確保をなくす（ピークメモリは最終列ぶんだけ）
+    unit_price = products_df["retail_price_jpy"].to_numpy()[prod_idx]
+    qty = rng.integers(1, 4, size=total, dtype=np.int8)
+    discount_price = (unit_price * rng.uniform(0.7, 1.0, size=total)).astype(np.int32)
+
+    return pd.DataFrame({
+        "transaction_item_id": np.char.mod("TI%08d", np.arange(1, total + 1)),
+        "transaction_id": tx_rep,
+        "product_id": products_df["product_id"].to_numpy()[prod_idx],
+        "quantity": qty,
+        "unit_price_jpy": unit_price,
+        "discount_price_jpy": discount_price,
+        "line_total_jpy": discount_price * qty,
+        # 各列はこの関数内で新規に確保した配列なのでコピー不要
+    }, copy=False)
 
 # ==================== メイン処理 ====================
 
+def _write_sheet_streaming(wb, df: pd.DataFrame, name: str):
+    """write-only モードの openpyxl ワークブックへ1シートを行ストリームで書き込む。"""
+    ws = wb.create_sheet(title=name)
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        ws.append(row)
+
+
+def _write_columnar(df: pd.DataFrame, path: str):
+    """1シート分を Parquet/Feather で書き出す（並列ワーカー用）。"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    # to_parquet/to_feather ラッパーを介さず Arrow テーブルへ直接変換して
+    # 書き込む。数値・カテゴリ列はゼロコピーで Arrow バッファに載り、
+    # pandas のインデックスメタデータも持ち込まない
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if path.endswith(".parquet"):
+        pq.write_table(table, path, compression="zstd")
+    else:
+        feather.write_feather(table, path)
+
+
 def main(output_file: str):
     print("== 簡易テスト用データ生成開始 ==")
     stores_df = generate_stores(); print(f" 店舗: {len(stores_df)}")
@@ -158,15 +185,54 @@ def main(output_file: str):
     transactions_df = generate_transactions(customers_df, stores_df); print(f" トランザクション: {len(transactions_df)}")
     items_df = generate_transaction_items(transactions_df, products_df); print(f" 明細: {len(items_df)}")
 
+    # 取引合計を乱数で独立に作らず、明細の合計から整合的に算出する
+    totals = items_df.groupby("transaction_id", sort=False)["line_total_jpy"].sum()
+    transactions_df["total_amount_jpy"] = (
+        transactions_df["transaction_id"].map(totals).fillna(0).astype("int32")
+    )
+
+    sheets = [
+        ("店舗", "stores", stores_df),
+        ("商品", "products", products_df),
+        ("顧客", "customers", customers_df),
+        ("トランザクション", "transactions", transactions_df),
+        ("トランザクション明細", "transaction_items", items_df),
+        ("プロモーション", "promotions", promotions_df),
+    ]
+
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    with pd.ExcelWriter(output_file, engine="openpyxl") as w:
-        stores_df.to_excel(w, sheet_name="店舗", index=False)
-        products_df.to_excel(w, sheet_name="商品", index=False)
-        customers_df.to_excel(w, sheet_name="顧客", index=False)
-        transactions_df.to_excel(w, sheet_name="トランザクション", index=False)
-        items_df.to_excel(w, sheet_name="トランザクション明細", index=False)
-        promotions_df.to_excel(w, sheet_name="プロモーション", index=False)
-    print(f"\n✓ 生成完了: {output_file}")
+    # 出力形式は拡張子（または SMALL_OUT_FORMAT）で切り替える。
+    # Excel は目視確認用、Parquet/Feather は CI・テスト用の高速パス
+    out_format = (os.getenv("SMALL_OUT_FORMAT") or os.path.splitext(output_file)[1].lstrip(".")).lower()
+    if out_format in ("parquet", "feather"):
+        out_dir = os.path.splitext(output_file)[0]
+        os.makedirs(out_dir, exist_ok=True)
+        # シート間に依存がないため、ファイル単位で並列に書き出す
+        with ProcessPoolExecutor(max_workers=len(sheets)) as executor:
+            futures = [
+                executor.submit(_write_columnar, df,
+                                os.path.join(out_dir, f"{name}.{out_format}"))
+                for _, name, df in sheets
+            ]
+            for future in futures:
+                future.result()
+        print(f"\n✓ 生成完了: {out_dir}/ ({out_format})")
+    else:
+        try:
+            # xlsxwriter は openpyxl よりセルあたりの処理が軽く、書き込みが速い
+            with pd.ExcelWriter(output_file, engine="xlsxwriter") as w:
+                for sheet_name, _, df in sheets:
+                    df.to_excel(w, sheet_name=sheet_name, index=False)
+        except ImportError:
+            # xlsxwriter が無い環境では openpyxl の write-only モードで
+            # 行単位にストリーム書き込みする（通常モードの全ツリー構築を回避）
+            import openpyxl
+
+            wb = openpyxl.Workbook(write_only=True)
+            for sheet_name, _, df in sheets:
+                _write_sheet_streaming(wb, df, sheet_name)
+            wb.save(output_file)
+        print(f"\n✓ 生成完了: {output_file}")
     print("サイズ軽量・学習高速化向け")
 
 if __name__ == "__main__":
@@ -1,4 +1,47 @@
 import React, { useState } from "react";
+import {
+  LineChart, Line, BarChart, Bar, XAxis, YAxis,
+  CartesianGrid, Tooltip, Legend, ResponsiveContainer,
+} from "recharts";
+
+const SERIES_COLORS = ["#1890ff", "#fa8c16", "#722ed1", "#52c41a"];
+
+// バックエンドのチャート仕様（{type, x, series, labels}）をrechartsで描画
+const AnalysisChart = ({ chart }) => {
+  if (!chart || !chart.x) return null;
+  const data = chart.x.map((x, i) => {
+    const row = { x };
+    chart.series.forEach((s) => {
+      row[s.name] = s.y[i];
+    });
+    return row;
+  });
+  const ChartComponent = chart.type === "bar" ? BarChart : LineChart;
+  return (
+    <ResponsiveContainer width="100%" height={320}>
+      <ChartComponent data={data}>
+        <CartesianGrid strokeDasharray="3 3" />
+        <XAxis dataKey="x" />
+        <YAxis />
+        <Tooltip />
+        <Legend />
+        {chart.series.map((s, i) =>
+          chart.type === "bar" ? (
+            <Bar key={s.name} dataKey={s.name} fill={SERIES_COLORS[i % SERIES_COLORS.length]} />
+          ) : (
+            <Line
+              key={s.name}
+              type="monotone"
+              dataKey={s.name}
+              stroke={SERIES_COLORS[i % SERIES_COLORS.length]}
+              dot={{ r: 3 }}
+            />
+          )
+        )}
+      </ChartComponent>
+    </ResponsiveContainer>
+  );
+};
 
 export default function DataAnalysisAssistant() {
   const [file, setFile] = useState(null);
@@ -83,12 +126,8 @@ export default function DataAnalysisAssistant() {
           {result.chart && (
             <div className="mb-4">
               <div className="text-lg font-semibold mb-2">グラフ：</div>
-              <div className="flex justify-center">
-                <img
-                  src={`data:image/png;base64,${result.chart}`}
-                  alt="分析グラフ"
-                  className="max-h-96 border rounded shadow"
-                />
+              <div className="border rounded shadow p-2">
+                <AnalysisChart chart={result.chart} />
               </div>
             </div>
           )}